@@ -5,55 +5,191 @@ This script converts Excel files to CSV format for use with the MQL dashboard.
 It handles data cleaning and formatting to ensure compatibility.
 """
 
-import pandas as pd
+import csv
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import os
 import sys
+from datetime import date, datetime, time
+from functools import lru_cache
 from pathlib import Path
+from openpyxl import load_workbook
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+# Normalized (lowercase, stripped) column names the dashboard expects
+EXPECTED_COLUMNS = (
+    'deal id', 'deal owner', 'stage', 'date for the stage',
+    'mrr', 'create date'
+)
+
+# Number of leading columns described in the format report's data summary
+SUMMARY_COLUMNS = 6
 
 
 def convert_excel_to_csv(excel_file="New MQLs Dataset.xlsx", output_file="mql.csv"):
     """
     Convert Excel file to CSV format with proper data cleaning.
     
+    The caller is expected to have checked that ``excel_file`` exists; a
+    missing file is reported like any other read error.
+    
+    Rows from the first sheet (see ``_iter_sheet_rows``) are written straight
+    to the CSV writer, so the sheet is never materialized as a DataFrame.
+    
     Args:
         excel_file (str): Path to the Excel file
         output_file (str): Path for the output CSV file
+    
+    Returns:
+        dict: Column statistics of the written CSV (see ``_check_summary``),
+        or None if the conversion failed
     """
+    # Rows are written to a temporary file that replaces output_file only once
+    # the whole sheet has been read, so a failed read leaves no partial CSV
+    tmp_file = f"{output_file}.tmp"
     try:
         print(f"📄 Reading Excel file: {excel_file}")
         
-        # Read Excel file
-        if os.path.exists(excel_file):
-            df = pd.read_excel(excel_file)
-            print(f"✅ Successfully loaded {len(df)} rows from Excel file")
-        else:
-            print(f"❌ Excel file '{excel_file}' not found")
-            return False
-        
-        # Display basic info about the data
-        print(f"📊 Data shape: {df.shape}")
-        print(f"🗂️ Columns: {list(df.columns)}")
-        
-        # Clean column names
-        df.columns = df.columns.str.strip()
-        
-        # Remove completely empty rows
-        df = df.dropna(how='all')
+        rows = _iter_sheet_rows(excel_file)
+        try:
+            # Clean column names. Blank header cells get pandas' "Unnamed: N"
+            # placeholder so the header doesn't depend on the installed reader
+            # (openpyxl yields None for them, calamine "")
+            header = _dedupe_columns([
+                (cell.strip() if isinstance(cell, str) else str(cell))
+                if cell is not None and cell != ""
+                else f"Unnamed: {i}"
+                for i, cell in enumerate(next(rows, ()))
+            ])
+            print(f"🗂️ Columns: {header}")
+            
+            row_count = 0
+            preview = []
+            non_null_counts = [0] * min(len(header), SUMMARY_COLUMNS)
+            samples = [None] * len(non_null_counts)
+            with open(tmp_file, "w", newline="", buffering=1 << 20) as f:
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(header)
+                
+                for row in rows:
+                    # Skip completely empty rows. A filled first cell settles
+                    # the common case without touching the rest of a wide row;
+                    # otherwise .count() scans the row in C rather than
+                    # through a generator expression
+                    first = row[0] if row else None
+                    if (first is None or first == "") and (
+                        row.count(None) + row.count("") == len(row)
+                    ):
+                        continue
+                    writer.writerow(row)
+                    
+                    # Collect the column statistics while the row is at hand
+                    for i, value in enumerate(row[:SUMMARY_COLUMNS]):
+                        if value is not None and value != "":
+                            non_null_counts[i] += 1
+                            if samples[i] is None:
+                                samples[i] = value
+                    
+                    if row_count < 3:
+                        preview.append(row)
+                    row_count += 1
+        finally:
+            rows.close()
+        os.replace(tmp_file, output_file)
         
-        # Save to CSV
-        df.to_csv(output_file, index=False)
         print(f"✅ Successfully converted to CSV: {output_file}")
-        print(f"📈 Final data shape: {df.shape}")
+        print(f"📈 Final data shape: ({row_count}, {len(header)})")
         
         # Display first few rows
         print("\n🔍 First 3 rows of converted data:")
-        print(df.head(3).to_string())
+        for row in preview:
+            print(dict(zip(header, row)))
         
-        return True
+        return {
+            "columns": header,
+            "num_rows": row_count,
+            "non_null_counts": non_null_counts,
+            "samples": samples,
+        }
         
     except Exception as e:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
         print(f"❌ Error converting Excel to CSV: {str(e)}")
-        return False
+        return None
+
+
+def _dedupe_columns(columns):
+    """
+    Make repeated column names unique the way pandas does ("MRR", "MRR.1").
+    
+    Args:
+        columns (list): Column names in sheet order
+    """
+    # Like pandas, skip suffixes that would collide with a name in the sheet
+    names = set(columns)
+    counts = {}
+    unique = []
+    for col in columns:
+        base = col
+        count = counts.get(col, 0)
+        while count > 0:
+            counts[base] = count + 1
+            col = f"{base}.{count}"
+            count = count + 1 if col in names else counts.get(col, 0)
+        counts[col] = count + 1
+        unique.append(col)
+    return unique
+
+
+def _iter_sheet_rows(excel_file):
+    """
+    Yield the rows of the first worksheet as sequences of cell values.
+    
+    Uses the Rust-based python-calamine reader when it is installed and falls
+    back to openpyxl's streaming read-only mode otherwise. Calamine parses
+    much faster but loads the whole sheet into memory before the first row
+    is yielded; only the openpyxl path streams.
+    
+    Args:
+        excel_file (str): Path to the Excel file
+    """
+    if CalamineWorkbook is not None:
+        workbook = CalamineWorkbook.from_path(excel_file)
+        try:
+            for row in workbook.get_sheet_by_index(0).iter_rows():
+                yield _from_calamine(row)
+        finally:
+            workbook.close()
+    else:
+        workbook = load_workbook(excel_file, read_only=True, data_only=True)
+        try:
+            yield from workbook.worksheets[0].iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+
+def _from_calamine(row):
+    """
+    Convert a python-calamine row to the cell values openpyxl yields.
+    
+    Calamine returns every number as a float and midnight datetimes as dates.
+    Like pandas' calamine engine, integral floats become ints and dates become
+    datetimes, so the CSV does not depend on which reader is installed.
+    
+    Args:
+        row (list): Cell values of one worksheet row
+    """
+    return tuple(
+        int(value) if isinstance(value, float) and value.is_integer()
+        else datetime.combine(value, time()) if type(value) is date
+        else value
+        for value in row
+    )
 
 
 def check_csv_format(csv_file="mql.csv"):
@@ -64,51 +200,104 @@ def check_csv_format(csv_file="mql.csv"):
         csv_file (str): Path to the CSV file to check
     """
     try:
-        if not os.path.exists(csv_file):
+        try:
+            stat = os.stat(csv_file)
+        except FileNotFoundError:
             print(f"❌ CSV file '{csv_file}' not found")
             return False
-            
-        df = pd.read_csv(csv_file)
-        
-        print(f"\n🔍 CSV File Analysis for {csv_file}:")
-        print(f"   📈 Shape: {df.shape}")
-        print(f"   🗂️ Columns: {list(df.columns)}")
-        
-        # Check for expected columns
-        expected_columns = [
-            'deal id', 'deal owner', 'stage', 'date for the stage', 
-            'mrr', 'create date'
-        ]
-        
-        found_columns = []
-        missing_columns = []
         
-        for col in expected_columns:
-            # Check for exact match or case-insensitive match
-            matches = [c for c in df.columns if c.lower().strip() == col.lower()]
-            if matches:
-                found_columns.append(matches[0])
-            else:
-                missing_columns.append(col)
-        
-        print(f"   ✅ Found columns: {found_columns}")
-        if missing_columns:
-            print(f"   ⚠️ Missing columns: {missing_columns}")
-        
-        # Check data types and sample values
-        print("\n📊 Data Summary:")
-        for col in df.columns[:6]:  # Show first 6 columns
-            non_null_count = df[col].count()
-            sample_value = df[col].dropna().iloc[0] if non_null_count > 0 else "N/A"
-            print(f"   {col}: {non_null_count}/{len(df)} non-null, Sample: '{sample_value}'")
-        
-        return True
+        summary = _read_csv_summary(csv_file, stat.st_mtime_ns, stat.st_size)
+        return _check_summary(csv_file, **summary)
         
     except Exception as e:
         print(f"❌ Error checking CSV format: {str(e)}")
         return False
 
 
+@lru_cache(maxsize=8)
+def _read_csv_summary(csv_file, mtime_ns, size):
+    """
+    Collect the column statistics reported by ``_check_summary`` from a CSV.
+    
+    Results are memoized; ``mtime_ns`` and ``size`` are only part of the cache
+    key so that a rewritten file is read again.
+    
+    Args:
+        csv_file (str): Path to the CSV file
+        mtime_ns (int): Modification time of the file in nanoseconds
+        size (int): Size of the file in bytes
+    """
+    # Only the summary columns are converted, all as text: just null counts
+    # and samples are needed, and fixed types keep later blocks from
+    # disagreeing with the first
+    with open(csv_file, newline="", encoding="utf-8-sig") as f:
+        columns = next(csv.reader(f), [])
+    summary_columns = columns[:SUMMARY_COLUMNS]
+    reader = pacsv.open_csv(
+        csv_file,
+        convert_options=pacsv.ConvertOptions(
+            include_columns=summary_columns,
+            column_types=dict.fromkeys(summary_columns, pa.string()),
+            strings_can_be_null=True,
+        ),
+    )
+    
+    # Stream record batches so only one block is held in memory at a time
+    num_rows = 0
+    non_null_counts = [0] * len(summary_columns)
+    samples = [None] * len(summary_columns)
+    for batch in reader:
+        num_rows += batch.num_rows
+        for i, column in enumerate(batch.columns):
+            non_null_count = len(column) - column.null_count
+            non_null_counts[i] += non_null_count
+            if samples[i] is None and non_null_count > 0:
+                samples[i] = column.drop_null()[0].as_py()
+    
+    return {
+        "columns": columns,
+        "num_rows": num_rows,
+        "non_null_counts": non_null_counts,
+        "samples": samples,
+    }
+
+
+def _check_summary(csv_file, columns, num_rows, non_null_counts, samples):
+    """
+    Report whether already-collected column statistics match the format
+    expected by the dashboard.
+    
+    Args:
+        csv_file (str): Name of the CSV file the statistics describe
+        columns (list): Column names in file order
+        num_rows (int): Number of data rows
+        non_null_counts (list): Non-null value count per leading column
+        samples (list): First non-null value per leading column (None if empty)
+    """
+    print(f"\n🔍 CSV File Analysis for {csv_file}:")
+    print(f"   📈 Shape: ({num_rows}, {len(columns)})")
+    print(f"   🗂️ Columns: {list(columns)}")
+    
+    # Check for expected columns. Map normalized names to the original column
+    # (first occurrence wins) so each expected column is a single lookup
+    normalized = {c.lower().strip(): c for c in reversed(columns)}
+    found_columns = [normalized[col] for col in EXPECTED_COLUMNS if col in normalized]
+    missing_columns = [col for col in EXPECTED_COLUMNS if col not in normalized]
+    
+    print(f"   ✅ Found columns: {found_columns}")
+    if missing_columns:
+        print(f"   ⚠️ Missing columns: {missing_columns}")
+    
+    # Check data types and sample values
+    print("\n📊 Data Summary:")
+    # Show the first SUMMARY_COLUMNS columns
+    for col, non_null_count, sample in zip(columns, non_null_counts, samples):
+        sample_value = sample if non_null_count > 0 else "N/A"
+        print(f"   {col}: {non_null_count}/{num_rows} non-null, Sample: '{sample_value}'")
+    
+    return True
+
+
 def main():
     """
     Main function to handle Excel to CSV conversion.
@@ -123,18 +312,16 @@ def main():
         "data.xlsx"
     ]
     
-    excel_file = None
-    for file in excel_files:
-        if os.path.exists(file):
-            excel_file = file
-            break
+    excel_file = next((f for f in excel_files if Path(f).is_file()), None)
     
     if excel_file:
         print(f"📄 Found Excel file: {excel_file}")
-        success = convert_excel_to_csv(excel_file)
+        summary = convert_excel_to_csv(excel_file)
         
-        if success:
-            check_csv_format("mql.csv")
+        if summary is not None:
+            # Report from the statistics gathered while converting rather
+            # than parsing the freshly written CSV a second time
+            _check_summary("mql.csv", **summary)
             print("\n✅ Conversion completed successfully!")
             print("📈 You can now run the dashboard with: streamlit run streamlit_dashboard.py")
         else:
@@ -3,12 +3,18 @@ MQL Pipeline Dashboard - Streamlit Application
 A comprehensive interactive dashboard for Marketing Qualified Lead data
 """
 
+import hashlib
+import os
+import threading
 import warnings
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import pyarrow as pa
+import pyarrow.parquet as pq
 import streamlit as st
 
 warnings.filterwarnings("ignore")
@@ -31,6 +37,28 @@ STAGE_ORDER = [
     "Upgrade (Sales Pipeline)",
 ]
 
+# Map source column names (lowercased and stripped) to standardized names
+COLUMN_MAPPING = {
+    "deal id": "deal_id",
+    "deal owner": "deal_owner",
+    "stage": "stage",
+    "date for the stage": "date",
+    "mrr": "mrr",
+    "est mrr ($)": "est_mrr",
+    "create date": "create_date",
+    "deal stage": "deal_stage",
+    "entry/exit": "entry_exit",
+}
+
+# Source data file
+DATA_FILE = "mql.csv"
+
+# Bump when the cleaning in load_data changes so existing Parquet copies of the
+# data are rebuilt; edits to STAGE_ORDER and COLUMN_MAPPING are picked up
+# automatically
+SIDECAR_VERSION = 1
+SIDECAR_KEY_FIELD = b"mql_dashboard_key"
+
 # Set page configuration
 st.set_page_config(
     page_title="MQL Pipeline Dashboard",
@@ -81,30 +109,36 @@ st.markdown(
 )
 
 
-@st.cache_data
-def load_data():
-    """Load and preprocess the MQL data"""
-    try:
-        df = pd.read_csv("mql.csv")
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_data(path=DATA_FILE, mtime=None):
+    """Load and preprocess the MQL data
 
-        # Clean column names
+    The frame is shared across sessions without copying, so callers must not
+    modify it. ``mtime`` is only part of the cache key: passing the file's
+    modification time reloads the data when the file changes, and only the
+    latest version is kept in memory.
+    """
+    parquet_path = os.path.splitext(path)[0] + ".parquet"
+    try:
+        # Serve the cleaned Parquet copy while it matches the CSV
+        source = os.stat(path)
+        df = read_sidecar(parquet_path, source)
+        if df is not None:
+            return add_data_bounds(apply_category_dtypes(df))
+
+        # The pyarrow engine parses the file with Arrow's multithreaded reader
+        df = pd.read_csv(path, engine="pyarrow")
+        # Unlike the C engine, it keeps repeated header names as they are;
+        # re-read those files so duplicates get unique names ("MRR.1")
+        if df.columns.duplicated().any():
+            df = pd.read_csv(path)
+
+        # Clean column names, then apply the mapping; names missing from the
+        # data are ignored
         df.columns = df.columns.str.strip().str.lower()
-        column_mapping = {
-            "deal id": "deal_id",
-            "deal owner": "deal_owner",
-            "stage": "stage",
-            "date for the stage": "date",
-            "mrr": "mrr",
-            "est mrr ($)": "est_mrr",
-            "create date": "create_date",
-            "deal stage": "deal_stage",
-            "entry/exit": "entry_exit",
-        }
-
-        # Apply column mapping if columns exist
-        for old_col, new_col in column_mapping.items():
-            if old_col in df.columns:
-                df = df.rename(columns={old_col: new_col})
+        df = df.rename(columns=COLUMN_MAPPING)
+
+        df = apply_category_dtypes(df)
 
         # Parse dates - use 'date for the stage' as the primary date
         if "date" in df.columns:
@@ -119,26 +153,22 @@ def load_data():
                 df["date"] = df["create_date"]
                 df["year_month"] = df["date"].dt.to_period("M")
 
-        # Clean MRR values
+        # Clean MRR values: drop currency symbols and thousands separators,
+        # anything missing or unparseable counts as 0
         if "mrr" in df.columns:
+            mrr_text = df["mrr"].astype(str).str.replace(r"[$,]", "", regex=True)
+            df["clean_mrr"] = pd.to_numeric(
+                mrr_text.str.strip(), errors="coerce"
+            ).fillna(0.0)
 
-            def clean_mrr_value(x):
-                if pd.isna(x) or str(x).strip() == "":
-                    return 0.0
-                str_val = str(x).replace("$", "").replace(",", "")
-                first_part = str_val.split("$")[0]
-                try:
-                    return float(first_part) if first_part else 0.0
-                except (ValueError, TypeError):
-                    return 0.0
-
-            df["clean_mrr"] = df["mrr"].apply(clean_mrr_value)
+        # Keep the cleaned frame as Parquet so later loads skip the CSV parse
+        write_sidecar(df, parquet_path, source)
 
-        return df
+        return add_data_bounds(df)
 
     except FileNotFoundError:
         st.error(
-            "❌ mql.csv file not found. Please ensure the file is in the same directory."
+            f"❌ {path} file not found. Please ensure the file is in the same directory."
         )
         return pd.DataFrame()
     except Exception as e:
@@ -146,32 +176,136 @@ def load_data():
         return pd.DataFrame()
 
 
-def apply_stage_ordering(df):
-    """Apply correct stage ordering to dataframe"""
+def sidecar_key(source):
+    """Identify the CSV and cleaning rules a Parquet copy was built from
+
+    ``source`` is the ``os.stat`` result of the CSV. Its exact modification
+    time and size are part of the key, so a CSV replaced by an older copy
+    (e.g. with ``cp -p``) is not mistaken for the one the Parquet came from.
+    """
+    rules = repr(
+        (
+            SIDECAR_VERSION,
+            STAGE_ORDER,
+            COLUMN_MAPPING,
+            source.st_mtime_ns,
+            source.st_size,
+        )
+    ).encode("utf-8")
+    return hashlib.sha256(rules).hexdigest().encode("ascii")
+
+
+def read_sidecar(parquet_path, source):
+    """Read the cleaned Parquet copy of the data, or None if it can't be used
+
+    The copy is only used if it was built from the CSV described by
+    ``source`` with the current cleaning rules (see ``sidecar_key``).
+    """
+    try:
+        metadata = pq.read_schema(parquet_path).metadata or {}
+        if metadata.get(SIDECAR_KEY_FIELD) != sidecar_key(source):
+            return None
+        return pd.read_parquet(parquet_path, engine="pyarrow")
+    except Exception:
+        return None  # Missing, stale or corrupt; rebuild from the CSV
+
+
+def write_sidecar(df, parquet_path, source):
+    """Write the cleaned data to Parquet, replacing any previous copy atomically"""
+    # A name unique to this thread; creating it normally (rather than with
+    # mkstemp's 0600) gives the file the same umask-based mode as the CSV
+    tmp_path = "{}.{}.{}.parquet.tmp".format(
+        os.path.splitext(parquet_path)[0], os.getpid(), threading.get_ident()
+    )
+    try:
+        table = pa.Table.from_pandas(df)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), SIDECAR_KEY_FIELD: sidecar_key(source)}
+        )
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, parquet_path)
+    except Exception:
+        # The Parquet copy is only a cache; the CSV stays the source
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def apply_category_dtypes(df):
+    """Set the categorical dtypes that the views rely on
+
+    Applied to both CSV and Parquet loads: Parquet does not round-trip a
+    categorical of numeric deal IDs, and an older copy may store stage as
+    plain text.
+    """
+    # Deal IDs repeat across stage rows; as a categorical, the distinct
+    # deal counts work on integer codes instead of hashing values
+    if "deal_id" in df.columns:
+        df["deal_id"] = df["deal_id"].astype("category")
+
+    # Order stages once here so every view inherits the categorical dtype
     if "stage" in df.columns:
-        # Create a categorical column with the correct order
         df["stage"] = pd.Categorical(df["stage"], categories=STAGE_ORDER, ordered=True)
     return df
 
 
+def add_data_bounds(df):
+    """Record the date and MRR ranges in df.attrs for the sidebar filters"""
+    if "date" in df.columns and not df["date"].isna().all():
+        df.attrs["date_min"] = df["date"].min()
+        df.attrs["date_max"] = df["date"].max()
+    if "clean_mrr" in df.columns:
+        df.attrs["mrr_min"] = df["clean_mrr"].min()
+        df.attrs["mrr_max"] = df["clean_mrr"].max()
+    return df
+
+
 def get_ordered_stages(df):
     """Get stages in the correct order that exist in the data"""
     if "stage" not in df.columns:
         return []
 
-    existing_stages = df["stage"].dropna().unique()
-    ordered_stages = [stage for stage in STAGE_ORDER if stage in existing_stages]
-    return ordered_stages
+    # stage is an ordered categorical, so counts come out in STAGE_ORDER
+    stage_counts = df["stage"].value_counts(sort=False)
+    return stage_counts.index[stage_counts.to_numpy() > 0].tolist()
+
+
+@st.cache_data
+def get_owner_performance(df):
+    """Aggregate deals and MRR per deal owner, highest total MRR first"""
+    return (
+        df.groupby("deal_owner", observed=True)
+        .agg(
+            total_deals=("deal_id", "nunique"),
+            total_mrr=("clean_mrr", "sum"),
+            avg_mrr=("clean_mrr", "mean"),
+        )
+        .round(2)
+        .sort_values("total_mrr", ascending=False)
+    )
+
+
+@st.cache_data
+def get_monthly_summary(df):
+    """Aggregate deal rows, distinct deals and MRR per month with growth rates"""
+    by_month = df.groupby("year_month", observed=True)
+    monthly = by_month.size().to_frame("deal_rows")
+    if "deal_id" in df.columns:
+        monthly["total_deals"] = by_month["deal_id"].nunique()
+        monthly["deal_growth"] = monthly["total_deals"].pct_change() * 100
+    if "clean_mrr" in df.columns:
+        monthly["total_mrr"] = by_month["clean_mrr"].sum().round(2)
+        monthly["mrr_growth"] = monthly["total_mrr"].pct_change() * 100
+    return monthly
 
 
 def create_sidebar_filters(df):
     """Create sidebar filters for the dashboard"""
     st.sidebar.markdown("## 🎛️ Dashboard Controls")
 
-    # Date range filter
-    if "date" in df.columns and not df["date"].isna().all():
-        min_date = df["date"].min().date()
-        max_date = df["date"].max().date()
+    # Date range filter, bounded by the range recorded in load_data
+    if "date_min" in df.attrs:
+        min_date = df.attrs["date_min"].date()
+        max_date = df.attrs["date_max"].date()
 
         date_range = st.sidebar.date_input(
             "📅 Select Date Range",
@@ -205,48 +339,60 @@ def create_sidebar_filters(df):
         selected_owners = []
 
     # MRR threshold
-    if "clean_mrr" in df.columns:
+    if "mrr_min" in df.attrs:
+        min_mrr = int(df.attrs["mrr_min"])
+        max_mrr = int(df.attrs["mrr_max"])
         mrr_range = st.sidebar.slider(
             "💰 MRR Range ($)",
-            min_value=int(df["clean_mrr"].min()),
-            max_value=int(df["clean_mrr"].max()),
-            value=(int(df["clean_mrr"].min()), int(df["clean_mrr"].max())),
+            min_value=min_mrr,
+            max_value=max_mrr,
+            value=(min_mrr, max_mrr),
             step=100,
         )
     else:
         mrr_range = None
 
-    return date_range, selected_stages, selected_owners, mrr_range
+    # Return hashable, order-independent selections so filter_data's cache
+    # hits whenever the filters are unchanged
+    return (
+        tuple(date_range) if date_range else None,
+        tuple(sorted(selected_stages)),
+        tuple(sorted(selected_owners)),
+        tuple(mrr_range) if mrr_range else None,
+    )
+
 
+# Keyed on the source file and its modification time rather than the frame
+# itself, so a cache hit skips hashing the whole source frame
+@st.cache_data(max_entries=8)
+def filter_data(path, mtime, date_range, selected_stages, selected_owners, mrr_range):
+    """Apply filters to the data loaded by ``load_data(path, mtime)``"""
+    df = load_data(path, mtime)
 
-def filter_data(df, date_range, selected_stages, selected_owners, mrr_range):
-    """Apply filters to the dataframe"""
-    filtered_df = df.copy()
+    # Combine every active filter into one mask and select rows once
+    mask = np.ones(len(df), dtype=bool)
 
     # Apply date filter
     if date_range and len(date_range) == 2 and "date" in df.columns:
-        start_date = pd.to_datetime(date_range[0])
-        end_date = pd.to_datetime(date_range[1])
-        filtered_df = filtered_df[
-            (filtered_df["date"] >= start_date) & (filtered_df["date"] <= end_date)
-        ]
+        start_date = pd.to_datetime(date_range[0]).to_datetime64()
+        end_date = pd.to_datetime(date_range[1]).to_datetime64()
+        dates = df["date"].to_numpy()
+        mask &= (dates >= start_date) & (dates <= end_date)
 
     # Apply stage filter
     if selected_stages and "stage" in df.columns:
-        filtered_df = filtered_df[filtered_df["stage"].isin(selected_stages)]
+        mask &= df["stage"].isin(selected_stages).to_numpy()
 
     # Apply owner filter
     if selected_owners and "deal_owner" in df.columns:
-        filtered_df = filtered_df[filtered_df["deal_owner"].isin(selected_owners)]
+        mask &= df["deal_owner"].isin(selected_owners).to_numpy()
 
     # Apply MRR filter
     if mrr_range and "clean_mrr" in df.columns:
-        filtered_df = filtered_df[
-            (filtered_df["clean_mrr"] >= mrr_range[0])
-            & (filtered_df["clean_mrr"] <= mrr_range[1])
-        ]
+        mrr = df["clean_mrr"].to_numpy()
+        mask &= (mrr >= mrr_range[0]) & (mrr <= mrr_range[1])
 
-    return filtered_df
+    return df.loc[mask]
 
 
 def display_key_metrics(df):
@@ -285,20 +431,15 @@ def create_pipeline_overview(df):
         st.warning("No data available for pipeline overview.")
         return
 
-    # Apply stage ordering
-    df = apply_stage_ordering(df)
-
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("📊 Deals by Stage")
         if "stage" in df.columns:
-            stage_counts = df["stage"].value_counts()
-            # Reorder according to stage order
-            ordered_stages = get_ordered_stages(df)
-            stage_counts = stage_counts.reindex(
-                [s for s in ordered_stages if s in stage_counts.index]
-            )
+            # Counts of the ordered categorical come out in stage order
+            stage_counts = df["stage"].value_counts(sort=False)
+            stage_counts = stage_counts[stage_counts > 0]
+            ordered_stages = stage_counts.index.tolist()
 
             fig_bar = px.bar(
                 x=stage_counts.values,
@@ -320,20 +461,23 @@ def create_pipeline_overview(df):
     with col2:
         st.subheader("🥧 Pipeline Distribution")
         if "clean_mrr" in df.columns and "stage" in df.columns:
-            stage_mrr = df.groupby("stage")["clean_mrr"].sum()
-            # Reorder according to stage order
-            ordered_stages = get_ordered_stages(df)
-            stage_mrr = stage_mrr.reindex(
-                [s for s in ordered_stages if s in stage_mrr.index]
-            )
-
-            fig_pie = px.pie(
-                values=stage_mrr.values,
-                names=stage_mrr.index,
+            # Grouping the ordered categorical yields stages in stage order
+            stage_mrr = df.groupby("stage", observed=True)["clean_mrr"].sum()
+
+            # Fold stages under 1% of the total into a single "Other" slice
+            small = stage_mrr < stage_mrr.sum() * 0.01
+            values = stage_mrr[~small].tolist()
+            labels = stage_mrr.index[~small].tolist()
+            if small.any():
+                values.append(stage_mrr[small].sum())
+                labels.append("Other")
+
+            fig_pie = go.Figure(go.Pie(values=values, labels=labels, sort=False))
+            fig_pie.update_layout(
                 title="MRR Distribution by Stage",
-                color_discrete_sequence=px.colors.qualitative.Set3,
+                height=400,
+                piecolorway=px.colors.qualitative.Set3,
             )
-            fig_pie.update_layout(height=400)
             st.plotly_chart(fig_pie, use_container_width=True)
         else:
             st.info("MRR or stage data not available")
@@ -347,15 +491,18 @@ def create_time_series_analysis(df):
 
     st.subheader("📈 Time Series Analysis")
 
-    # Apply stage ordering
-    df = apply_stage_ordering(df)
+    # Monthly totals are computed once per filtered frame; the per-stage
+    # series share one grouping on the month column built in load_data
+    monthly = get_monthly_summary(df)
+    if "stage" in df.columns:
+        by_month_stage = df.groupby([df["year_month"], "stage"], observed=True)
 
     # First row: Basic time series
     col1, col2 = st.columns(2)
 
     with col1:
         # Monthly deal volume
-        monthly_deals = df.groupby(df["date"].dt.to_period("M")).size()
+        monthly_deals = monthly["deal_rows"]
         fig_line1 = px.line(
             x=monthly_deals.index.astype(str),
             y=monthly_deals.values,
@@ -369,7 +516,7 @@ def create_time_series_analysis(df):
     with col2:
         # Monthly MRR trend
         if "clean_mrr" in df.columns:
-            monthly_mrr = df.groupby(df["date"].dt.to_period("M"))["clean_mrr"].sum()
+            monthly_mrr = monthly["total_mrr"]
             fig_line2 = px.line(
                 x=monthly_mrr.index.astype(str),
                 y=monthly_mrr.values,
@@ -387,9 +534,7 @@ def create_time_series_analysis(df):
 
     if "stage" in df.columns:
         # Create monthly deals by stage
-        monthly_stage_deals = (
-            df.groupby([df["date"].dt.to_period("M"), "stage"]).size().reset_index()
-        )
+        monthly_stage_deals = by_month_stage.size().reset_index()
         monthly_stage_deals.columns = ["month", "stage", "deal_count"]
         monthly_stage_deals["month"] = monthly_stage_deals["month"].astype(str)
 
@@ -427,11 +572,7 @@ def create_time_series_analysis(df):
         st.subheader("💰 MRR by Stage Over Time")
 
         # Create monthly MRR by stage
-        monthly_stage_mrr = (
-            df.groupby([df["date"].dt.to_period("M"), "stage"])["clean_mrr"]
-            .sum()
-            .reset_index()
-        )
+        monthly_stage_mrr = by_month_stage["clean_mrr"].sum().reset_index()
         monthly_stage_mrr.columns = ["month", "stage", "mrr"]
         monthly_stage_mrr["month"] = monthly_stage_mrr["month"].astype(str)
 
@@ -464,16 +605,16 @@ def create_time_series_analysis(df):
         # Summary statistics table
         st.subheader("📋 Monthly Summary Statistics")
 
-        # Calculate monthly totals and growth
-        monthly_totals = (
-            df.groupby(df["date"].dt.to_period("M"))
-            .agg({"deal_id": "nunique", "clean_mrr": "sum"})
-            .round(2)
-        )
-        monthly_totals.columns = ["Total Deals", "Total MRR"]
-        monthly_totals["MRR Growth %"] = monthly_totals["Total MRR"].pct_change() * 100
-        monthly_totals["Deal Growth %"] = (
-            monthly_totals["Total Deals"].pct_change() * 100
+        # Monthly totals and growth
+        monthly_totals = monthly[
+            ["total_deals", "total_mrr", "mrr_growth", "deal_growth"]
+        ].rename(
+            columns={
+                "total_deals": "Total Deals",
+                "total_mrr": "Total MRR",
+                "mrr_growth": "MRR Growth %",
+                "deal_growth": "Deal Growth %",
+            }
         )
 
         # Format the table
@@ -503,16 +644,7 @@ def create_performance_analysis(df):
 
     if "deal_owner" in df.columns and "clean_mrr" in df.columns:
         # Owner performance analysis
-        owner_performance = (
-            df.groupby("deal_owner")
-            .agg({"deal_id": "nunique", "clean_mrr": ["sum", "mean"]})
-            .round(2)
-        )
-
-        owner_performance.columns = ["total_deals", "total_mrr", "avg_mrr"]
-        owner_performance = owner_performance.sort_values(
-            "total_mrr", ascending=False
-        ).head(10)
+        owner_performance = get_owner_performance(df).head(10)
 
         col1, col2 = st.columns(2)
 
@@ -545,11 +677,19 @@ def create_performance_analysis(df):
 
         # Performance table
         st.subheader("📊 Detailed Performance Metrics")
+        # Let the browser format currency so the columns stay numeric/sortable;
+        # step=1 rounds the dollar format to whole dollars
         st.dataframe(
-            owner_performance.style.format(
-                {"total_mrr": "${:,.0f}", "avg_mrr": "${:,.0f}"}
-            ),
+            owner_performance,
             use_container_width=True,
+            column_config={
+                "total_mrr": st.column_config.NumberColumn(
+                    "Total MRR", format="dollar", step=1
+                ),
+                "avg_mrr": st.column_config.NumberColumn(
+                    "Avg MRR", format="dollar", step=1
+                ),
+            },
         )
     else:
         st.info("Owner or MRR data not available for performance analysis")
@@ -563,20 +703,12 @@ def create_funnel_analysis(df):
 
     st.subheader("🔄 Sales Funnel Analysis")
 
-    # Apply stage ordering
-    df = apply_stage_ordering(df)
-
-    # Create funnel data using ordered stages
-    ordered_stages = get_ordered_stages(df)
-    stage_counts = df["stage"].value_counts()
-
-    # Reorder according to stage order
-    ordered_stage_counts = []
-    ordered_stage_names = []
-    for stage in ordered_stages:
-        if stage in stage_counts.index:
-            ordered_stage_counts.append(stage_counts[stage])
-            ordered_stage_names.append(stage)
+    # Create funnel data; counts of the ordered categorical come out in
+    # stage order, so only the stages without deals need dropping
+    stage_counts = df["stage"].value_counts(sort=False)
+    stage_counts = stage_counts[stage_counts > 0]
+    ordered_stage_counts = stage_counts.tolist()
+    ordered_stage_names = stage_counts.index.tolist()
 
     # Create funnel chart
     fig_funnel = go.Figure(
@@ -596,33 +728,32 @@ def create_funnel_analysis(df):
     # Conversion rates
     if len(ordered_stage_counts) > 1:
         st.subheader("📈 Stage Conversion Rates")
-        conversion_data = []
-        for i in range(len(ordered_stage_counts) - 1):
-            from_stage = ordered_stage_names[i]
-            to_stage = ordered_stage_names[i + 1]
-            conversion_rate = (
-                ordered_stage_counts[i + 1] / ordered_stage_counts[i]
-            ) * 100
-            conversion_data.append(
-                {
-                    "From Stage": from_stage,
-                    "To Stage": to_stage,
-                    "From Count": ordered_stage_counts[i],
-                    "To Count": ordered_stage_counts[i + 1],
-                    "Conversion Rate (%)": f"{conversion_rate:.1f}%",
-                }
-            )
-
-        conversion_df = pd.DataFrame(conversion_data)
-        st.dataframe(conversion_df, use_container_width=True)
+        # Every listed stage has deals, so the divisions are safe
+        counts = np.asarray(ordered_stage_counts)
+        conversion_rates = counts[1:] / counts[:-1] * 100
+        conversion_df = pd.DataFrame(
+            {
+                "From Stage": ordered_stage_names[:-1],
+                "To Stage": ordered_stage_names[1:],
+                "From Count": counts[:-1],
+                "To Count": counts[1:],
+                "Conversion Rate (%)": conversion_rates,
+            }
+        )
+        st.dataframe(
+            conversion_df,
+            use_container_width=True,
+            column_config={
+                "Conversion Rate (%)": st.column_config.NumberColumn(format="%.1f%%")
+            },
+        )
 
         # Conversion rate visualization
-        conversion_rates = [
-            float(row["Conversion Rate (%)"].rstrip("%")) for row in conversion_data
-        ]
         conversion_labels = [
-            f"{row['From Stage'][:20]}... → {row['To Stage'][:20]}..."
-            for row in conversion_data
+            f"{from_stage[:20]}... → {to_stage[:20]}..."
+            for from_stage, to_stage in zip(
+                ordered_stage_names[:-1], ordered_stage_names[1:]
+            )
         ]
 
         fig_conversion = px.bar(
@@ -647,7 +778,7 @@ def create_alerts_monitoring(df):
     if not df.empty:
         # Check for low pipeline value
         if "clean_mrr" in df.columns:
-            total_pipeline = df["clean_mrr"].sum()
+            total_pipeline = df["clean_mrr"].to_numpy().sum()
             if total_pipeline < 50000:
                 alerts.append(
                     f"🚨 Low Pipeline Value: ${total_pipeline:,.0f} (Threshold: $50,000)"
@@ -665,10 +796,12 @@ def create_alerts_monitoring(df):
 
         # Check for stagnant pipeline
         if "date" in df.columns:
-            recent_deals = df[df["date"] >= (datetime.now() - timedelta(days=30))]
-            if len(recent_deals) < 10:
+            # Count on the raw datetime array instead of building a subset frame
+            cutoff = np.datetime64(datetime.now() - timedelta(days=30))
+            recent_count = int((df["date"].to_numpy() >= cutoff).sum())
+            if recent_count < 10:
                 alerts.append(
-                    f"📉 Low Recent Activity: Only {len(recent_deals)} deals in last 30 days"
+                    f"📉 Low Recent Activity: Only {recent_count} deals in last 30 days"
                 )
 
     if alerts:
@@ -681,6 +814,13 @@ def create_alerts_monitoring(df):
         )
 
 
+# Bounded like filter_data: each entry holds a full CSV export in memory
+@st.cache_data(max_entries=8)
+def to_csv_bytes(df, index=False):
+    """Serialize a dataframe to CSV bytes for a download button"""
+    return df.to_csv(index=index).encode("utf-8")
+
+
 def export_data(df):
     """Create export functionality"""
     st.subheader("📥 Export Data")
@@ -688,32 +828,25 @@ def export_data(df):
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        if st.button("📊 Export Filtered Data"):
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="Download CSV",
-                data=csv,
-                file_name=f"mql_filtered_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-            )
+        # The CSV is only built when the button is clicked, and
+        # on_click="ignore" serves it without rerunning the app
+        st.download_button(
+            label="📊 Export Filtered Data",
+            data=lambda: to_csv_bytes(df),
+            file_name=f"mql_filtered_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            mime="text/csv",
+            on_click="ignore",
+        )
 
     with col2:
         if "deal_owner" in df.columns and "clean_mrr" in df.columns:
-            if st.button("🏆 Export Performance Report"):
-                owner_performance = (
-                    df.groupby("deal_owner")
-                    .agg({"deal_id": "nunique", "clean_mrr": ["sum", "mean"]})
-                    .round(2)
-                )
-                owner_performance.columns = ["total_deals", "total_mrr", "avg_mrr"]
-
-                csv = owner_performance.to_csv()
-                st.download_button(
-                    label="Download Performance CSV",
-                    data=csv,
-                    file_name=f"performance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                )
+            st.download_button(
+                label="🏆 Export Performance Report",
+                data=lambda: to_csv_bytes(get_owner_performance(df), index=True),
+                file_name=f"performance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv",
+                on_click="ignore",
+            )
 
     with col3:
         st.metric("📈 Filtered Records", len(df))
@@ -732,21 +865,19 @@ def main():
         unsafe_allow_html=True,
     )
 
-    # Load data
-    df = load_data()
+    # Load data, keyed on the file's modification time so edits are picked up
+    mtime = os.path.getmtime(DATA_FILE) if os.path.exists(DATA_FILE) else None
+    df = load_data(DATA_FILE, mtime)
 
     if df.empty:
         st.stop()
 
-    # Apply stage ordering to the original data
-    df = apply_stage_ordering(df)
-
     # Sidebar filters
     date_range, selected_stages, selected_owners, mrr_range = create_sidebar_filters(df)
 
     # Apply filters
     filtered_df = filter_data(
-        df, date_range, selected_stages, selected_owners, mrr_range
+        DATA_FILE, mtime, date_range, selected_stages, selected_owners, mrr_range
     )
 
     # Display key metrics